@@ -3,12 +3,28 @@ import pandas as pd
 import numpy as np
 from datetime import date, timedelta, datetime
 import os
+import csv
+import re
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the ledger kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # ==== CONFIGURATION ====
 DATA_DIR = "data"
-TX_FILE = os.path.join(DATA_DIR, "transactions.csv")
+TX_FILE = os.path.join(DATA_DIR, "transactions.csv")  # legacy CSV store, migrated on first load
+TX_PARQUET = os.path.join(DATA_DIR, "transactions.parquet")
+TX_COLUMNS = ["Date", "User", "Type", "Amount"]
 NAV_FILE = os.path.join(DATA_DIR, "nav.csv")
 AUDIT_FILE = os.path.join(DATA_DIR, "audit.csv")
+AUDIT_COLUMNS = ["Timestamp", "Action", "Details", "Admin"]
+AUDIT_MAX_BYTES = 50 * 1024 * 1024  # rotate the audit log past this size
+SUMMARY_COLUMNS = [
+    "User", "Shares", "Deposits", "Withdrawals", "Value",
+    "Profit", "WithdrawalFee", "ProfitFee", "AfterFees",
+]
 
 # --- Use secrets for admin password ---
 ADMIN_USER = st.secrets["admin"]["username"] if "admin" in st.secrets else "Admin"
@@ -20,45 +36,103 @@ DEFAULT_PROFIT_FEE = 0.02
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # ==== HELPERS ====
+@st.cache_data(show_spinner=False, max_entries=4)  # one live stamp per CSV file
+def _read_csv_cached(f, stamp):
+    # stamp = (mtime_ns, size) so any write to the file invalidates the entry
+    df = pd.read_csv(f)
+    for col in ["Date", "Timestamp"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    return df
+
 def load_csv(f, columns):
     if os.path.exists(f):
-        df = pd.read_csv(f)
-        for col in ["Date", "Timestamp"]:
-            if col in df.columns:
-                df[col] = df[col].astype(str)
-        return df
+        stat = os.stat(f)
+        return _read_csv_cached(f, (stat.st_mtime_ns, stat.st_size))
     else:
         return pd.DataFrame(columns=columns)
 
 def save_csv(df, f):
     df.to_csv(f, index=False)
 
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_parquet_cached(f, stamp):
+    return pd.read_parquet(f)
+
+def categorize_transactions(df):
+    # Fixed column types: str Date, float Amount (bad cells become 0.0) so Parquet writes never
+    # see mixed objects; categorical User/Type so groupby and comparisons work on integer codes
+    df = df.copy()
+    df["Date"] = df["Date"].astype(str)
+    df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce").fillna(0.0)
+    df["User"] = df["User"].astype("category").cat.remove_unused_categories()
+    df["Type"] = df["Type"].astype("category")
+    return df
+
+def load_transactions():
+    if os.path.exists(TX_PARQUET):
+        stat = os.stat(TX_PARQUET)
+        return categorize_transactions(_read_parquet_cached(TX_PARQUET, (stat.st_mtime_ns, stat.st_size)))
+    df = categorize_transactions(load_csv(TX_FILE, TX_COLUMNS))
+    if os.path.exists(TX_FILE):
+        save_transactions(df)
+    return df
+
+def save_transactions(df):
+    # Columnar and typed: no float formatting on save or parsing on load
+    df.to_parquet(TX_PARQUET, compression="zstd", index=False)
+
+def transactions_frame():
+    # Session transactions are a list of records; materialize once per change
+    if st.session_state.get("transactions_df") is None:
+        st.session_state["transactions_df"] = categorize_transactions(
+            pd.DataFrame.from_records(st.session_state["transactions"], columns=TX_COLUMNS)
+        )
+    return st.session_state["transactions_df"]
+
+def transactions_changed():
+    # Drop the materialized frame and persist the updated records
+    st.session_state["transactions_df"] = None
+    st.session_state["recalc_dirty"] = True
+    save_transactions(transactions_frame())
+
+def rotate_audit():
+    # Move a full log aside as audit.<timestamp>.csv; the next append starts a fresh file
+    if os.path.exists(AUDIT_FILE) and os.path.getsize(AUDIT_FILE) > AUDIT_MAX_BYTES:
+        stamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        os.replace(AUDIT_FILE, os.path.join(DATA_DIR, f"audit.{stamp}.csv"))
+
 def append_audit(action, details, admin):
-    audit = load_csv(AUDIT_FILE, ["Timestamp", "Action", "Details", "Admin"])
-    new_row = pd.DataFrame([{
-        "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "Action": action,
-        "Details": details,
-        "Admin": admin,
-    }])
-    audit = pd.concat([audit, new_row], ignore_index=True)
-    save_csv(audit, AUDIT_FILE)
+    # Stream one row onto the end of the log instead of rewriting the whole file
+    rotate_audit()
+    header_needed = not os.path.exists(AUDIT_FILE) or os.path.getsize(AUDIT_FILE) == 0
+    with open(AUDIT_FILE, "a", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        if header_needed:
+            writer.writerow(AUDIT_COLUMNS)
+        writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), action, details, admin])
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def nav_frame(nav_items):
+    return pd.DataFrame(list(nav_items), columns=["Date", "NAV"])
 
 def to_money(val):
     return f"{val:,.2f}".replace(",", " ")
 
 # ==== LOAD STATE OR INIT ====
 if "transactions" not in st.session_state:
-    st.session_state["transactions"] = load_csv(TX_FILE, ["Date", "User", "Type", "Amount"])
+    st.session_state["transactions"] = load_transactions().to_dict("records")
 if "nav" not in st.session_state:
     nav_df = load_csv(NAV_FILE, ["Date", "NAV"])
-    st.session_state["nav"] = {row["Date"]: float(row["NAV"]) for _, row in nav_df.iterrows()}
+    st.session_state["nav"] = dict(zip(nav_df["Date"].tolist(), nav_df["NAV"].astype(float).tolist()))
 if "is_admin" not in st.session_state:
     st.session_state["is_admin"] = False
 if "withdraw_fee" not in st.session_state:
     st.session_state["withdraw_fee"] = DEFAULT_WITHDRAW_FEE
 if "profit_fee" not in st.session_state:
     st.session_state["profit_fee"] = DEFAULT_PROFIT_FEE
+if "recalc_dirty" not in st.session_state:
+    st.session_state["recalc_dirty"] = True
 
 # ==== AUTH ====
 def admin_login():
@@ -82,101 +156,143 @@ def admin_logout():
     append_audit("AdminLogout", "Logged out", ADMIN_USER)
     st.rerun()
 
+# ==== SHARE LEDGER KERNEL ====
+@njit(cache=True)
+def _share_ledger_kernel(day_end, user_ids, is_deposit, amounts, nav_override, n_users):
+    """Walk date-sorted transactions, returning per-row shares, amount, NAV/share and end-of-day NAV/share."""
+    n = len(amounts)
+    shares_out = np.zeros(n)
+    amount_out = amounts.copy()
+    nav_ps_out = np.ones(n)
+    nav_per_share_by_date = np.ones(len(nav_override))
+    balances = np.zeros(n_users)
+    total_shares = 0.0
+    nav = 0.0
+
+    # Withdrawals are clamped to the running balance, so this stays sequential
+    start = 0
+    for day in range(len(nav_override)):
+        if not np.isnan(nav_override[day]):
+            nav = nav_override[day]
+        for i in range(start, day_end[day]):
+            u = user_ids[i]
+            nav_per_share_now = nav / total_shares if total_shares > 0 else 1.0
+            shares = amounts[i] / nav_per_share_now if nav_per_share_now > 0 else 0.0
+            if is_deposit[i]:
+                total_shares += shares
+                nav += amounts[i]  # Increase fund NAV by deposit
+                balances[u] += shares
+            else:
+                shares = min(shares, balances[u])
+                payout = shares * nav_per_share_now
+                total_shares -= shares
+                nav -= payout  # Decrease NAV by payout
+                balances[u] -= shares
+                amount_out[i] = -payout  # For reporting, withdrawal amount is negative
+            shares_out[i] = shares
+            nav_ps_out[i] = nav_per_share_now
+        start = day_end[day]
+        # Save the NAV/share at END of day
+        nav_per_share_by_date[day] = nav / total_shares if total_shares > 0 else 1.0
+    return shares_out, amount_out, nav_ps_out, nav_per_share_by_date
+
 # ==== CORRECTED CALCULATION LOGIC ====
 def recalculate_fund(transactions, nav_history, withdraw_fee, profit_fee):
+    # Nothing to walk: skip the copy, sort and kernel call entirely
+    if transactions.empty and not nav_history:
+        return {}, pd.DataFrame(columns=SUMMARY_COLUMNS), pd.DataFrame()
+
+    # Work on a copy: this runs inside st.cache_data and must not touch its argument
+    transactions = transactions.copy()
+
     # Ensure Amount column is numeric
     if "Amount" in transactions:
         transactions["Amount"] = pd.to_numeric(transactions["Amount"], errors="coerce").fillna(0.0)
 
     # Sort transactions by Date and then by their original order for consistency
-    transactions = transactions.copy().sort_values(["Date", "User"]).reset_index(drop=True)
+    transactions = transactions.sort_values(["Date", "User"]).reset_index(drop=True)
+    transactions["Date"] = transactions["Date"].astype(str)
 
-    all_dates = sorted(set(nav_history.keys()) | set(transactions["Date"].astype(str).unique()))
-    if not all_dates:
-        return {}, {}, {}, {}, {}, pd.DataFrame(), {}
-
-    nav_per_share = {}
-    total_shares = 0.0
-    nav = 0.0
-    user_share_balances = {}
-    share_ledger = []
-    users = transactions["User"].unique()
-
-    # For profit calculation
-    deposit_sum = {u: 0.0 for u in users}
-    withdrawal_sum = {u: 0.0 for u in users}
-
-    prev_nav = None
-
-    for d in all_dates:
-        d_str = str(d)
-        # Start-of-day NAV is previous day's end NAV unless this is the first day
-        if prev_nav is None:
-            nav = float(nav_history.get(d_str, 0.0))
-        else:
-            nav = float(nav_history.get(d_str, prev_nav))
-        prev_nav = nav
-
-        # Calculate NAV/share BEFORE any transactions for today
-        nav_per_share_today = nav / total_shares if total_shares > 0 else 1.0
-
-        # Process all transactions today, in order
-        txs_today = transactions[transactions["Date"].astype(str) == d_str]
-        for idx, row in txs_today.iterrows():
-            amt = float(row["Amount"])
-            u = row["User"]
-            ttype = row["Type"]
-            nav_per_share_now = nav / total_shares if total_shares > 0 else 1.0
+    all_dates = sorted(set(nav_history.keys()) | set(transactions["Date"].unique()))
 
-            if ttype == "Deposit":
-                shares = amt / nav_per_share_now if nav_per_share_now > 0 else 0.0
-                total_shares += shares
-                nav += amt  # Increase fund NAV by deposit
-                user_share_balances[u] = user_share_balances.get(u, 0.0) + shares
-                deposit_sum[u] = deposit_sum.get(u, 0.0) + amt
-            elif ttype == "Withdrawal":
-                shares = amt / nav_per_share_now if nav_per_share_now > 0 else 0.0
-                shares = min(shares, user_share_balances.get(u, 0.0))
-                payout = shares * nav_per_share_now
-                total_shares -= shares
-                nav -= payout  # Decrease NAV by payout
-                user_share_balances[u] = user_share_balances.get(u, 0.0) - shares
-                withdrawal_sum[u] = withdrawal_sum.get(u, 0.0) + payout
-                amt = -payout  # For reporting, withdrawal amount is negative
-            else:
-                continue
+    # Start-of-day NAV overrides over the full calendar (NaN = carry forward)
+    nav_override = pd.Series(nav_history, dtype=float).reindex(all_dates).to_numpy()
 
-            share_ledger.append({
-                "Date": d_str, "User": u, "Type": ttype, "Amount": amt,
-                "Shares": shares, "NAV/Share": nav_per_share_now
-            })
+    # Only deposits and withdrawals move shares
+    tx = transactions[transactions["Type"].isin(["Deposit", "Withdrawal"])].reset_index(drop=True)
+    # Rows are date-sorted, so each day is a contiguous slice ending at day_end[day]
+    day_end = np.searchsorted(tx["Date"].to_numpy(dtype=str), np.array(all_dates), side="right")
+    amounts = tx["Amount"].to_numpy(dtype=float)
+    is_deposit = (tx["Type"] == "Deposit").to_numpy()
+    user_ids, user_names = pd.factorize(tx["User"], use_na_sentinel=False)
 
-        # Save the NAV/share at END of day
-        nav_per_share[d_str] = nav / total_shares if total_shares > 0 else 1.0
-        prev_nav = nav
-
-    # Calculate current value of every user's shares
-    final_nav_share = nav_per_share.get(all_dates[-1], 1.0)
-    user_shares = {u: user_share_balances.get(u, 0.0) for u in user_share_balances}
-    user_value = {u: user_shares[u] * final_nav_share for u in user_shares}
-
-    # Compute profit
-    profit = {}
-    for u in user_shares:
-        profit[u] = user_value[u] - deposit_sum.get(u, 0.0) + withdrawal_sum.get(u, 0.0)
-
-    # After-fee calculation
-    after_fees = {}
-    fee_details = {}
-    for u in user_shares:
-        gross = user_value[u]
-        withdrawal_fee_amt = gross * withdraw_fee
-        profit_fee_amt = max(profit[u], 0) * profit_fee
-        after_fees[u] = gross - withdrawal_fee_amt - profit_fee_amt
-        fee_details[u] = {"withdrawal_fee": withdrawal_fee_amt, "profit_fee": profit_fee_amt}
-
-    ledger_df = pd.DataFrame(share_ledger)
-    return nav_per_share, user_shares, user_value, after_fees, profit, ledger_df, fee_details
+    shares_out, amount_out, nav_ps_out, nav_per_share_by_date = _share_ledger_kernel(
+        day_end, user_ids, is_deposit, amounts, nav_override, len(user_names)
+    )
+    nav_per_share = dict(zip(all_dates, nav_per_share_by_date))
+
+    ledger_df = pd.DataFrame({
+        "Date": tx["Date"], "User": tx["User"], "Type": tx["Type"], "Amount": amount_out,
+        "Shares": shares_out, "NAV/Share": nav_ps_out,
+    })
+
+    # Per-user totals in one pass each
+    signed_shares = np.where(is_deposit, shares_out, -shares_out)
+    share_totals = np.bincount(user_ids, weights=signed_shares, minlength=len(user_names))
+    # Deposits and payouts in one pass: bin (user, type) pairs, then pivot to two columns
+    flow_bins = 2 * user_ids + ~is_deposit
+    flow = np.bincount(
+        flow_bins, weights=np.where(is_deposit, amount_out, -amount_out), minlength=2 * len(user_names)
+    ).reshape(-1, 2)
+    deposit_arr, withdrawal_arr = flow[:, 0], flow[:, 1]
+
+    # Value, profit and fees as parallel per-user arrays, assembled into one frame
+    value_arr = share_totals * nav_per_share_by_date[-1]
+    profit_arr = value_arr - deposit_arr + withdrawal_arr
+    withdrawal_fee_arr = value_arr * withdraw_fee
+    profit_fee_arr = np.maximum(profit_arr, 0) * profit_fee
+    summary = pd.DataFrame({
+        "User": np.asarray(user_names, dtype=object),
+        "Shares": share_totals,
+        "Deposits": deposit_arr,
+        "Withdrawals": withdrawal_arr,
+        "Value": value_arr,
+        "Profit": profit_arr,
+        "WithdrawalFee": withdrawal_fee_arr,
+        "ProfitFee": profit_fee_arr,
+        "AfterFees": value_arr - withdrawal_fee_arr - profit_fee_arr,
+    })
+
+    return nav_per_share, summary, ledger_df
+
+def tx_fingerprint(transactions):
+    # Order-sensitive content hash, so reordered rows are a different key
+    return pd.util.hash_pandas_object(transactions, index=False).to_numpy().tobytes()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def recalculate_fund_cached(tx_key, nav_items, withdraw_fee, profit_fee, _transactions):
+    # _transactions is not hashed by Streamlit; tx_key stands in for it
+    return recalculate_fund(_transactions, dict(nav_items), withdraw_fee, profit_fee)
+
+# ==== CHART DATA ====
+@st.cache_data(show_spinner=False, max_entries=8)
+def nav_chart_series(nav_items):
+    nav_hist = pd.DataFrame(list(nav_items), columns=["Date", "NAV"])
+    nav_hist["Date"] = pd.to_datetime(nav_hist["Date"])
+    return nav_hist.set_index("Date")["NAV"]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def wallet_chart_series(tx_key, nav_items, user, _ledger_df, _nav_per_share):
+    # tx_key and nav_items fully determine the ledger, so they key the unhashed args
+    ledger_df_user = _ledger_df[_ledger_df["User"] == user]
+    shares = ledger_df_user["Shares"].to_numpy()
+    signed_shares = np.where(ledger_df_user["Type"].to_numpy() == "Deposit", shares, -shares)
+    nav_arr = ledger_df_user["Date"].map(_nav_per_share).fillna(1.0).to_numpy()
+    wallet_chart = pd.DataFrame({
+        "Date": pd.to_datetime(ledger_df_user["Date"].to_numpy()),
+        "Wallet": signed_shares.cumsum() * nav_arr,
+    })
+    return wallet_chart.set_index("Date")["Wallet"]
 
 # ==== MAIN UI ====
 st.set_page_config("FundBank", layout="wide")
@@ -186,21 +302,25 @@ st.markdown(
     "<b>Tip:</b> If your wallet is missing, contact an admin.</div>", unsafe_allow_html=True
 )
 
-nav_per_share, user_shares, user_value, after_fees, profit, ledger_df, fee_details = recalculate_fund(
-    st.session_state["transactions"], st.session_state["nav"],
-    st.session_state["withdraw_fee"], st.session_state["profit_fee"]
-)
-
-wallet_data = pd.DataFrame([
-    {
-        "User": u,
-        "Shares": user_shares[u],
-        "Wallet (Divines)": user_value[u],
-        "After Fees": after_fees[u],
-        "Profit": profit[u]
-    } for u in user_value if u
-])
-if not wallet_data.empty and "Wallet (Divines)" in wallet_data.columns:
+# Recompute only after transactions, NAV or fees changed; other reruns reuse the last result.
+# A change that lands back on the same content (e.g. a fee set and reset) is caught by the key.
+if st.session_state["recalc_dirty"] or "recalc_result" not in st.session_state:
+    transactions_df = transactions_frame()
+    recalc_key = (
+        tx_fingerprint(transactions_df), tuple(sorted(st.session_state["nav"].items())),
+        st.session_state["withdraw_fee"], st.session_state["profit_fee"],
+    )
+    if st.session_state.get("recalc_key") != recalc_key:
+        st.session_state["recalc_result"] = recalculate_fund_cached(*recalc_key, transactions_df)
+        st.session_state["recalc_key"] = recalc_key
+    st.session_state["recalc_dirty"] = False
+tx_key, nav_items = st.session_state["recalc_key"][:2]
+nav_per_share, summary, ledger_df = st.session_state["recalc_result"]
+
+wallet_data = summary.loc[
+    summary["User"].map(bool), ["User", "Shares", "Value", "AfterFees", "Profit"]
+].rename(columns={"Value": "Wallet (Divines)", "AfterFees": "After Fees"})
+if not wallet_data.empty:
     wallet_data = wallet_data.sort_values("Wallet (Divines)", ascending=False)
 
 # ========== USER MODE ==========
@@ -209,7 +329,12 @@ if wallet_data.empty:
     st.info("No deposits or NAV data entered yet.")
 else:
     search_user = st.text_input("🔍 Search Wallet/User", "")
-    filtered = wallet_data[wallet_data["User"].str.contains(search_user, case=False, na=False)] if search_user else wallet_data
+    if search_user:
+        # Literal, case-insensitive substring match: escape the text so regex characters are plain
+        search_pat = re.compile(re.escape(search_user), re.IGNORECASE)
+        filtered = wallet_data[wallet_data["User"].str.contains(search_pat, na=False)]
+    else:
+        filtered = wallet_data
     st.dataframe(filtered.style.format({
         "Shares": "{:.4f}",
         "Wallet (Divines)": "{:.2f}",
@@ -225,9 +350,7 @@ else:
 
 st.subheader("📈 Fund NAV Over Time")
 if st.session_state["nav"]:
-    nav_hist = pd.DataFrame(sorted(st.session_state["nav"].items()), columns=["Date", "NAV"])
-    nav_hist["Date"] = pd.to_datetime(nav_hist["Date"])
-    st.line_chart(nav_hist.set_index("Date")["NAV"], height=220)
+    st.line_chart(nav_chart_series(nav_items), height=220)
 else:
     st.info("No NAV data yet for chart.")
 
@@ -235,20 +358,9 @@ st.subheader("📈 Individual Wallet Growth")
 if not wallet_data.empty:
     wallet_users = list(wallet_data["User"])
     user_for_chart = st.selectbox("Select user for wallet history", wallet_users)
-    ledger_df_user = ledger_df[ledger_df["User"] == user_for_chart]
-    if not ledger_df_user.empty:
-        wallet_chart = []
-        running_shares = 0
-        for idx, row in ledger_df_user.iterrows():
-            if row["Type"] == "Deposit":
-                running_shares += row["Shares"]
-            elif row["Type"] == "Withdrawal":
-                running_shares -= row["Shares"]
-            nav = nav_per_share.get(row["Date"], 1.0)
-            wallet_chart.append({"Date": row["Date"], "Wallet": running_shares * nav})
-        wallet_chart = pd.DataFrame(wallet_chart)
-        wallet_chart["Date"] = pd.to_datetime(wallet_chart["Date"])
-        st.line_chart(wallet_chart.set_index("Date")["Wallet"], height=220)
+    wallet_chart = wallet_chart_series(tx_key, nav_items, user_for_chart, ledger_df, nav_per_share)
+    if not wallet_chart.empty:
+        st.line_chart(wallet_chart, height=220)
     else:
         st.info("No transactions for this user.")
 else:
@@ -268,6 +380,7 @@ st.caption("Admins can change all settings, fees, fund value, and transactions."
 
 # -- Fee Controls --
 st.markdown("#### ⚙️ Fund Settings (Live Fees)")
+fees_before = (st.session_state["withdraw_fee"], st.session_state["profit_fee"])
 c1, c2 = st.columns(2)
 with c1:
     st.session_state["withdraw_fee"] = st.number_input(
@@ -281,6 +394,8 @@ with c2:
         min_value=0.0, max_value=20.0,
         value=st.session_state["profit_fee"]*100, step=0.01, format="%.2f"
     )/100
+if (st.session_state["withdraw_fee"], st.session_state["profit_fee"]) != fees_before:
+    st.session_state["recalc_dirty"] = True
 
 # -- Deposit/Withdraw --
 st.markdown("### New Deposit or Withdrawal")
@@ -292,9 +407,10 @@ with st.form("add_tx", clear_on_submit=True):
     tx_date = c4.date_input("Date", value=date.today(), min_value=START_DATE)
     submit = st.form_submit_button("Add Entry")
     if submit and user:
-        tx = pd.DataFrame([[str(tx_date), user.strip(), ttype, amt]], columns=["Date","User","Type","Amount"])
-        st.session_state["transactions"] = pd.concat([st.session_state["transactions"], tx], ignore_index=True)
-        save_csv(st.session_state["transactions"], TX_FILE)
+        st.session_state["transactions"].append(
+            {"Date": str(tx_date), "User": user.strip(), "Type": ttype, "Amount": amt}
+        )
+        transactions_changed()
         append_audit("AddTx", f"{ttype} {amt} for {user} on {tx_date}", ADMIN_USER)
         st.success(f"{ttype} for {user} added.")
         st.rerun()
@@ -308,7 +424,7 @@ st.warning(
 )
 
 # Get all users who currently have at least one transaction
-existing_users = sorted(st.session_state["transactions"]["User"].dropna().unique())
+existing_users = sorted(transactions_frame()["User"].dropna().unique())
 
 if existing_users:
     del_user = st.selectbox(
@@ -327,8 +443,8 @@ if existing_users:
     with del_col1:
         if st.button("Delete Wallet", key="delete_wallet_btn", disabled=delete_disabled):
             before_count = len(st.session_state["transactions"])
-            st.session_state["transactions"] = st.session_state["transactions"][st.session_state["transactions"]["User"] != del_user]
-            save_csv(st.session_state["transactions"], TX_FILE)
+            st.session_state["transactions"] = [r for r in st.session_state["transactions"] if r["User"] != del_user]
+            transactions_changed()
             append_audit(
                 "DeleteWallet",
                 f"Deleted ALL transactions for user '{del_user}' ({before_count - len(st.session_state['transactions'])} removed)",
@@ -349,18 +465,28 @@ st.markdown("### Edit Fund NAV per Day")
 today = date.today()
 min_date = START_DATE
 days_range = (today - min_date).days + 1
-nav_changed = False
-for i in range(days_range):
-    d = min_date + timedelta(days=i)
-    d_str = str(d)
-    nav_val = st.session_state["nav"].get(d_str, 0.0)
-    nav_input = st.number_input(f"{d} NAV (Total Fund Value)", min_value=0.0, value=nav_val, step=0.01, format="%.2f", key=f"nav_{d_str}")
-    if nav_input != nav_val:
-        st.session_state["nav"][d_str] = nav_input
-        nav_changed = True
-
+nav_days = [str(min_date + timedelta(days=i)) for i in range(days_range)]
+nav_grid = pd.DataFrame({"Date": nav_days, "NAV": [st.session_state["nav"].get(d, 0.0) for d in nav_days]})
+edited_nav = st.data_editor(
+    nav_grid,
+    key="nav_editor",
+    num_rows="fixed",
+    hide_index=True,
+    disabled=["Date"],
+    column_config={
+        "NAV": st.column_config.NumberColumn("NAV (Total Fund Value)", min_value=0.0, step=0.01, format="%.2f"),
+    },
+    use_container_width=True,
+)
+# Only write back edited days, so untouched days keep carrying the previous NAV forward
+edited_vals = edited_nav["NAV"].fillna(0.0).to_numpy(dtype=float)
+nav_changed = edited_vals != nav_grid["NAV"].to_numpy(dtype=float)
+if nav_changed.any():
+    st.session_state["nav"].update(zip(edited_nav["Date"][nav_changed], edited_vals[nav_changed].tolist()))
+    st.session_state["recalc_dirty"] = True
+
+nav_save_df = nav_frame(tuple(sorted(st.session_state["nav"].items())))
 if st.button("Save NAV"):
-    nav_save_df = pd.DataFrame([{"Date": d, "NAV": v} for d,v in st.session_state["nav"].items()])
     save_csv(nav_save_df, NAV_FILE)
     append_audit("SaveNAV", f"NAVs saved.", ADMIN_USER)
     st.success("Fund NAVs saved!")
@@ -370,7 +496,7 @@ if st.button("Admin Logout"):
 
 # -- Audit Log & Export --
 st.markdown("### 📄 Audit Log (All Admin Actions)")
-audit_df = load_csv(AUDIT_FILE, ["Timestamp", "Action", "Details", "Admin"])
+audit_df = load_csv(AUDIT_FILE, AUDIT_COLUMNS)
 if audit_df.empty:
     st.info("No admin actions logged yet.")
 else:
@@ -388,12 +514,11 @@ colb1, colb2, colb3 = st.columns(3)
 with colb1:
     st.download_button(
         label="Download Transactions CSV",
-        data=st.session_state["transactions"].to_csv(index=False).encode(),
+        data=transactions_frame().to_csv(index=False).encode(),
         file_name="transactions_backup.csv",
         mime="text/csv",
     )
 with colb2:
-    nav_save_df = pd.DataFrame([{"Date": d, "NAV": v} for d,v in st.session_state["nav"].items()])
     st.download_button(
         label="Download NAV CSV",
         data=nav_save_df.to_csv(index=False).encode(),
@@ -403,9 +528,9 @@ with colb2:
 with colb3:
     uploaded = st.file_uploader("Restore Transactions CSV", type=["csv"])
     if uploaded is not None:
-        st.session_state["transactions"] = pd.read_csv(uploaded)
-        save_csv(st.session_state["transactions"], TX_FILE)
+        st.session_state["transactions"] = categorize_transactions(pd.read_csv(uploaded)).to_dict("records")
+        transactions_changed()
         append_audit("RestoreTx", "Transactions restored from upload.", ADMIN_USER)
         st.success("Transactions restored! Reload the app.")
 
-st.caption("All data is saved in the /data folder as CSV for backup & easy editing.")
+st.caption("All data is saved in the /data folder (transactions as Parquet, NAV and audit log as CSV). Use the downloads above for CSV backups.")